@@ -9,8 +9,9 @@ from bpy.props import (StringProperty,
 from bpy_extras.io_utils import ImportHelper
 from bpy.types import Operator
 from mathutils import *
-from datetime import datetime
+import time
 import struct
+import numpy as np
 
 bl_info = {
     "name": "Diesel model",
@@ -23,40 +24,49 @@ bl_info = {
 
 BINARY_VERSION = pd2tools_fdm.LIB_VERSION
 
-def hash(s):
-    return pd2tools_fdm.diesel_hash(s)
+hash = pd2tools_fdm.diesel_hash
+hash_many = pd2tools_fdm.diesel_hash_many
 
 def import_ir_from_file(hlp, path, units_per_cm, framerate):
-    ts_start = datetime.now()
+    ts_start = time.perf_counter_ns()
     ir_objects = pd2tools_fdm.import_ir_from_file(hlp, path, units_per_cm, framerate)
-    ts_conv = datetime.now()
+    ts_conv = time.perf_counter_ns()
+
+    new_object = bpy.data.objects.new
 
     mat_dict = {}
-    b_objects = {}
+    b_objects = []
     for obj in ir_objects:
         data = data_from_ir(obj.name, obj.data, mat_dict)
-        ob = bpy.data.objects.new(obj.name, data)
+        ob = new_object(obj.name, data)
+        b_objects.append(ob)
+
+        # Parents always come before their children, so it already exists.
+        parent_index = obj.parent_index
+        if not parent_index is None:
+            ob.parent = b_objects[parent_index]
+
+        # Animations target rotation_quaternion, so this has to be set even
+        # when the transform itself is left alone.
+        ob.rotation_mode = "QUATERNION"
+        transform = obj.transform
+        if not transform is None:
+            ob.matrix_local = Matrix(transform)
+
+        apply_anims(obj, ob)
+
+    # Link only once everything exists, so the scene isn't notified between
+    # every object creation.
+    link = bpy.context.scene.collection.objects.link
+    for ob in b_objects:
+        link(ob)
 
-        bpy.context.scene.collection.objects.link(ob)
-        b_objects[obj] = ob
-    
     bpy.context.view_layer.update()
+    ts_end = time.perf_counter_ns()
+    print("Loading: {:.3f}s".format((ts_conv - ts_start) / 1e9))
+    print("Importing: {:.3f}s".format((ts_end - ts_conv) / 1e9))
 
-    for obj in ir_objects:
-        if not obj.parent is None:
-            b_objects[obj].parent = b_objects[obj.parent]
-            bpy.context.view_layer.update()
-        
-        loc, rot, sca = Matrix(obj.transform).decompose()
-        b_objects[obj].location = (loc.x, loc.y, loc.z)
-        b_objects[obj].rotation_mode = "QUATERNION"
-        b_objects[obj].rotation_quaternion = (rot.w, rot.x, rot.y, rot.z)
-        b_objects[obj].scale = (sca.x, sca.y, sca.z)
-
-        apply_anims(obj, b_objects[obj])
-    ts_end = datetime.now()
-    print("Loading: {}".format(ts_conv - ts_start))
-    print("Importing: {}".format(ts_end - ts_conv))
+_HANDLE_VECTOR = bpy.types.Keyframe.bl_rna.properties["handle_left_type"].enum_items["VECTOR"].value
 
 def apply_anims(src, dest):
     if len(src.animations) == 0:
@@ -66,12 +76,19 @@ def apply_anims(src, dest):
     action = bpy.data.actions.new(dest.name)
     action.id_root = src.data_type
     dest.animation_data.action = action
+    new_fcurve = action.fcurves.new
     for chan in src.animations:
-        curve = action.fcurves.new(chan.target_path, index=chan.target_index)
-        for (ts, v) in chan.fcurve:
-            kf =  curve.keyframe_points.insert(ts, v, options={"NEEDED"})
-            kf.handle_left_type = "VECTOR"
-            kf.handle_right_type = "VECTOR"
+        curve = new_fcurve(chan.target_path, index=chan.target_index)
+        co = np.frombuffer(chan.fcurve, dtype=np.float32)
+        count = len(co) // 2
+        handles = np.full(count, _HANDLE_VECTOR, dtype=np.int32)
+
+        points = curve.keyframe_points
+        points.add(count)
+        points.foreach_set("co", co)
+        points.foreach_set("handle_left_type", handles)
+        points.foreach_set("handle_right_type", handles)
+        curve.update()
 
 
 def data_from_ir(name, data, mats):
@@ -84,70 +101,83 @@ def data_from_ir(name, data, mats):
     else:
         raise Exception("Unrecognised data type")
 
+# For each corner of a bounds box, which axes take the max rather than the min.
+_BOUND_CORNERS = np.array([
+    (1, 1, 1), (1, 0, 1), (1, 1, 0), (1, 0, 0),
+    (0, 1, 1), (0, 0, 1), (0, 1, 0), (0, 0, 0)
+], dtype=np.bool_)
+
+_BOUND_EDGES = np.array([
+    (0, 1), (1, 3),
+    (0, 2), (2, 3),
+
+    (4, 5), (5, 7),
+    (4, 6), (6, 7),
+
+    (0, 4), (1, 5), (2, 6), (3, 7)
+], dtype=np.int32)
+
 def bounds_from_ir(name, data):
-    bmax = data.box_max
-    bmin = data.box_min
-    verts = [
-        (bmax[0], bmax[1], bmax[2]),
-        (bmax[0], bmin[1], bmax[2]),
-        (bmax[0], bmax[1], bmin[2]),
-        (bmax[0], bmin[1], bmin[2]),
-
-        (bmin[0], bmax[1], bmax[2]),
-        (bmin[0], bmin[1], bmax[2]),
-        (bmin[0], bmax[1], bmin[2]),
-        (bmin[0], bmin[1], bmin[2])
-    ]
-    edges = [
-        (0, 1), (1, 3),
-        (0, 2), (2, 3),
-
-        (4, 5), (5, 7),
-        (4, 6), (6, 7),
-
-        (0, 4), (1, 5), (2, 6), (3, 7)
-    ]
+    bmax = np.array(data.box_max, dtype=np.float32)
+    bmin = np.array(data.box_min, dtype=np.float32)
+    verts = np.where(_BOUND_CORNERS, bmax, bmin)
+
     me = bpy.data.meshes.new(name)
-    me.from_pydata(verts, edges, [])
+    me.vertices.add(len(verts))
+    me.vertices.foreach_set("co", verts.ravel())
+    me.edges.add(len(_BOUND_EDGES))
+    me.edges.foreach_set("vertices", _BOUND_EDGES.ravel())
+    me.update()
     return me
 
 def mesh_from_ir(name, data, mats):
     me = bpy.data.meshes.new(name)
 
+    new_material = bpy.data.materials.new
+    append_material = me.materials.append
     for mn in data.material_names:
-        if not mn in mats:
-            mats[mn] = bpy.data.materials.new(mn)
-        me.materials.append(mats[mn])
+        mat = mats.get(mn)
+        if mat is None:
+            mat = mats[mn] = new_material(mn)
+        append_material(mat)
     
-    me.from_pydata(data.vert_positions, data.edges, data.faces)
-
-    #edge_flags = data.edge_flags
-    #for i in range(len(edge_flags)):
-    #    e = me.edges[i]
-    #    e.use_edge_sharp = edge_flags[i][0]
-    #    e.use_seam = edge_flags[i][1]
-
-    face_materials = data.face_materials
-    for i in range(len(face_materials)):
-        me.polygons[i].material_index = face_materials[i]
+    # Blender's index properties are signed ints, hence int32 rather than uint32.
+    positions, loop_verts, loop_start, loop_total = data.geometry()
+    positions = np.frombuffer(positions, dtype=np.float32)
+    loop_verts = np.frombuffer(loop_verts, dtype=np.int32)
+    loop_start = np.frombuffer(loop_start, dtype=np.int32)
+    loop_total = np.frombuffer(loop_total, dtype=np.int32)
+    face_count = len(loop_start)
+
+    me.vertices.add(len(positions) // 3)
+    me.vertices.foreach_set("co", positions)
+    me.loops.add(len(loop_verts))
+    me.loops.foreach_set("vertex_index", loop_verts)
+    me.polygons.add(face_count)
+    me.polygons.foreach_set("loop_start", loop_start)
+    me.polygons.foreach_set("loop_total", loop_total)
+    me.update(calc_edges=True)
+
+    me.polygons.foreach_set("material_index", np.frombuffer(data.face_materials, dtype=np.int32))
 
     if data.has_normals:
-        for f in me.polygons:
-            f.use_smooth = True
+        me.polygons.foreach_set("use_smooth", np.ones(face_count, dtype=np.bool_))
         me.use_auto_smooth = True
         me.create_normals_split()
-        norms = data.loop_normals
-        me.normals_split_custom_set(norms)
+        if data.has_vertex_normals:
+            norms = np.frombuffer(data.vert_normals, dtype=np.float32).reshape(-1, 3)
+            me.normals_split_custom_set_from_vertices(norms)
+        else:
+            norms = np.frombuffer(data.loop_normals, dtype=np.float32).reshape(-1, 3)
+            me.normals_split_custom_set(norms)
 
     for (name, uvs) in data.loop_uv_layers:
         uv = me.uv_layers.new(name=name)
-        for i in range(len(uvs)):
-            uv.data[i].uv = uvs[i]
+        uv.data.foreach_set("uv", np.frombuffer(uvs, dtype=np.float32))
 
     for (name, colours) in data.loop_colour_layers:
         col = me.vertex_colors.new(name=name)
-        for i in range(len(colours)):
-            col.data[i].color = colours[i]
+        col.data.foreach_set("color", np.frombuffer(colours, dtype=np.float32))
     
     return me
 
@@ -6,7 +6,6 @@
 //! * `[quaternion, vector3]`: rotation position
 
 use std::collections::HashMap;
-use std::collections::HashSet;
 
 use pyo3::{IntoPy, Python, Py, PyErr, PyObject};
 use thiserror::Error;
@@ -58,7 +57,8 @@ impl<T> ConvResultExt for ConvResult<T> {
 pub fn sections_to_ir<'s, 'hi, 'py>(py: Python<'py>, sections: &'s HashMap<u32, fdm::Section>, hashlist: &'hi HashIndex, units_per_cm: f32, framerate: f32) -> ConvResult<Vec<Py<ir::Object>>> {
     let mut reader = IrReader {
         py, sections, hashlist, units_per_cm, framerate,
-        objects: HashMap::new()
+        objects: HashMap::new(),
+        ordered_objects: Vec::new()
     };
 
     let ids = sections.iter().filter_map(|(k, v)| match v {
@@ -70,7 +70,7 @@ pub fn sections_to_ir<'s, 'hi, 'py>(py: Python<'py>, sections: &'s HashMap<u32,
     for i in ids {
         reader.get_object(i).at_object_id(i)?;
     }
-    Ok(reader.objects.drain().map(|(_,v)| v).collect::<Vec<_>>())
+    Ok(reader.ordered_objects)
 }
 
 macro_rules! expect_section {
@@ -96,7 +96,9 @@ struct IrReader<'s, 'hi, 'py> {
     hashlist: &'hi HashIndex,
     units_per_cm: f32,
     framerate: f32,
-    objects: HashMap<u32, Py<ir::Object>>
+    objects: HashMap<u32, Py<ir::Object>>,
+    /// Every object in `objects`, parents always before their children.
+    ordered_objects: Vec<Py<ir::Object>>
 }
 
 impl<'s, 'hi, 'py> IrReader<'s, 'hi, 'py> {
@@ -170,13 +172,17 @@ impl<'s, 'hi, 'py> IrReader<'s, 'hi, 'py> {
             Err(e) => return Err(ConversionError::BadParent(id, Box::new(e)))
         };
 
+        let parent_index = parent.as_ref().map(|p| p.borrow(self.py).index);
+
         let mut tf = sec.transform;
         tf.cols.w.x *= self.units_per_cm;
         tf.cols.w.y *= self.units_per_cm;
         tf.cols.w.z *= self.units_per_cm;
         let obj = ir::Object {
             name, parent,
-            transform: mat_to_row_tuples(tf),
+            index: 0,
+            parent_index,
+            transform: if tf == vek::Mat4::identity() { None } else { Some(mat_to_row_tuples(tf)) },
             animations: Vec::new(),
             data: None,
             weight_names: Vec::new()
@@ -185,6 +191,13 @@ impl<'s, 'hi, 'py> IrReader<'s, 'hi, 'py> {
         Ok(Py::new(self.py, obj)?)
     }
 
+    /// Record a finished object. Its parent must already have been added.
+    fn add_object(&mut self, id: u32, obj: Py<ir::Object>) {
+        obj.borrow_mut(self.py).index = self.ordered_objects.len();
+        self.objects.insert(id, obj.clone());
+        self.ordered_objects.push(obj);
+    }
+
     /// Obtain an object by it's section ID, or None if it doesn't exist at all.
     fn get_object(&mut self, id: u32) -> ConvResult<Option<Py<ir::Object>>> {
         if let Some(obj) = self.objects.get(&id) {
@@ -199,7 +212,7 @@ impl<'s, 'hi, 'py> IrReader<'s, 'hi, 'py> {
 
                 self.import_animations(&sec, obj.clone()).at_object_id(id)?;
 
-                self.objects.insert(id, obj.clone());
+                self.add_object(id, obj.clone());
                 Ok(Some(obj))
             },
             Some(fdm::Section::Model(md)) => {
@@ -207,7 +220,7 @@ impl<'s, 'hi, 'py> IrReader<'s, 'hi, 'py> {
 
                 self.import_animations(&md.object, obj.clone()).at_object_id(id)?;
 
-                self.objects.insert(id, obj.clone());
+                self.add_object(id, obj.clone());
                 Ok(Some(obj))
             }
             //Some(fdm::Section::Camera(_)) => todo!(),
@@ -255,27 +268,30 @@ impl<'s, 'hi, 'py> IrReader<'s, 'hi, 'py> {
 
         let vcache = merge_vertices(geo, self.units_per_cm);
         let vertex_map = vcache.index_map;
+        let vert_count = vcache.weights.len();
         let mut mesh = ir::Mesh {
             material_names,
             has_normals: geo.normal.len() > 0,
+            has_vertex_normals: false,
             vert_positions: vcache.positions,
+            vert_normals: Vec::new(),
             vert_weights: vcache.weights,
-            edges: Vec::with_capacity(topo.faces.len() * 3),
-            edge_flags: Vec::with_capacity(topo.faces.len() * 3),
-            faces: Vec::with_capacity(topo.faces.len()),
+            faces: Vec::with_capacity(topo.faces.len() * 3),
             face_materials: Vec::with_capacity(topo.faces.len()),
-            loop_normals: Vec::with_capacity(topo.faces.len() * 3),
+            loop_normals: Vec::with_capacity(topo.faces.len() * 3 * 3),
             loop_uv_layers: Vec::with_capacity(8),
             loop_colour_layers: Vec::with_capacity(2)
         };
-        let mut seen_edges = HashSet::<(usize, usize)>::new();
+        // Normal of each merged vertex, until a loop disagrees with it.
+        let mut vert_normals = vec![None; if mesh.has_normals { vert_count } else { 0 }];
+        let mut normals_per_vertex = mesh.has_normals;
         let mut uv_sources = Vec::<&Vec<Vec2f>>::with_capacity(8);
         let mut color_sources = Vec::<&Vec<Rgba>>::with_capacity(2);
 
         macro_rules! add_texcoord {
             ($f:ident, $n:literal) => {
                 if geo.$f.len() > 0 {
-                    mesh.loop_uv_layers.push((String::from($n), Vec::with_capacity(topo.faces.len() * 3)));
+                    mesh.loop_uv_layers.push((String::from($n), Vec::with_capacity(topo.faces.len() * 3 * 2)));
                     uv_sources.push(&geo.$f);
                 }
             }
@@ -290,11 +306,11 @@ impl<'s, 'hi, 'py> IrReader<'s, 'hi, 'py> {
         add_texcoord!(tex_coord_7, "uv_7");
 
         if geo.color_0.len() > 0 {
-            mesh.loop_colour_layers.push((String::from("col_0"), Vec::with_capacity(topo.faces.len() * 3)));
+            mesh.loop_colour_layers.push((String::from("col_0"), Vec::with_capacity(topo.faces.len() * 3 * 4)));
             color_sources.push(&geo.color_0);
         }
         if geo.color_1.len() > 0 {
-            mesh.loop_colour_layers.push((String::from("col_1"), Vec::with_capacity(topo.faces.len() * 3)));
+            mesh.loop_colour_layers.push((String::from("col_1"), Vec::with_capacity(topo.faces.len() * 3 * 4)));
             color_sources.push(&geo.color_1);
         }
 
@@ -311,42 +327,49 @@ impl<'s, 'hi, 'py> IrReader<'s, 'hi, 'py> {
                 let m_v1 = vertex_map[v1_i];
                 let m_v2 = vertex_map[v2_i];
 
-                let e0 = ( usize::min(m_v0, m_v1), usize::max(m_v0, m_v1) );
-                let e1 = ( usize::min(m_v1, m_v2), usize::max(m_v1, m_v2) );
-                let e2 = ( usize::min(m_v2, m_v0), usize::max(m_v2, m_v0) );
-                if seen_edges.insert(e0) {
-                    mesh.edges.push(e0); mesh.edge_flags.push((false, false));
-                }
-                if seen_edges.insert(e1) {
-                    mesh.edges.push(e1); mesh.edge_flags.push((false, false));
-                }
-                if seen_edges.insert(e2) {
-                    mesh.edges.push(e2); mesh.edge_flags.push((false, false));
-                }
-
                 for i in 0..color_sources.len() {
-                    mesh.loop_colour_layers[i].1.push(rgba_bytes_to_float(color_sources[i][v0_i]));
-                    mesh.loop_colour_layers[i].1.push(rgba_bytes_to_float(color_sources[i][v1_i]));
-                    mesh.loop_colour_layers[i].1.push(rgba_bytes_to_float(color_sources[i][v2_i]));
+                    mesh.loop_colour_layers[i].1.extend_from_slice(&rgba_bytes_to_float(color_sources[i][v0_i]));
+                    mesh.loop_colour_layers[i].1.extend_from_slice(&rgba_bytes_to_float(color_sources[i][v1_i]));
+                    mesh.loop_colour_layers[i].1.extend_from_slice(&rgba_bytes_to_float(color_sources[i][v2_i]));
                 }
                 
                 for i in 0..uv_sources.len() {
-                    mesh.loop_uv_layers[i].1.push(uv_sources[i][v0_i].into_tuple());
-                    mesh.loop_uv_layers[i].1.push(uv_sources[i][v1_i].into_tuple());
-                    mesh.loop_uv_layers[i].1.push(uv_sources[i][v2_i].into_tuple());
+                    mesh.loop_uv_layers[i].1.extend_from_slice(&uv_sources[i][v0_i].into_array());
+                    mesh.loop_uv_layers[i].1.extend_from_slice(&uv_sources[i][v1_i].into_array());
+                    mesh.loop_uv_layers[i].1.extend_from_slice(&uv_sources[i][v2_i].into_array());
                 }
 
                 if mesh.has_normals {
-                    mesh.loop_normals.push(geo.normal[v0_i].into_tuple());
-                    mesh.loop_normals.push(geo.normal[v1_i].into_tuple());
-                    mesh.loop_normals.push(geo.normal[v2_i].into_tuple());
+                    for &(m_v, v_i) in &[(m_v0, v0_i), (m_v1, v1_i), (m_v2, v2_i)] {
+                        let normal = geo.normal[v_i].into_array();
+                        mesh.loop_normals.extend_from_slice(&normal);
+                        if normals_per_vertex {
+                            let seen = vert_normals[m_v];
+                            match seen {
+                                None => vert_normals[m_v] = Some(normal),
+                                Some(n) => normals_per_vertex = n == normal
+                            }
+                        }
+                    }
                 }
 
-                mesh.face_materials.push(ra.material as usize);
-                mesh.faces.push((m_v0, m_v1, m_v2));
+                mesh.face_materials.push(ra.material as u32);
+                mesh.faces.extend_from_slice(&[m_v0 as u32, m_v1 as u32, m_v2 as u32]);
             }
         }
 
+        // If every loop of a vertex has the same normal, per-vertex normals are
+        // a third of the data. Unused vertices get a zero normal, which Blender
+        // takes to mean "leave it alone".
+        if normals_per_vertex {
+            mesh.has_vertex_normals = true;
+            mesh.vert_normals = Vec::with_capacity(vert_count * 3);
+            for n in vert_normals {
+                mesh.vert_normals.extend_from_slice(&n.unwrap_or([0.0; 3]));
+            }
+            mesh.loop_normals = Vec::new();
+        }
+
         let mut objref = obj.borrow_mut(self.py);
         let data = Py::new(self.py, mesh)?;
         objref.data = Some(data.into_py(self.py));
@@ -356,7 +379,8 @@ impl<'s, 'hi, 'py> IrReader<'s, 'hi, 'py> {
 }
 
 struct VertexCache {
-    positions: Vec<(f32, f32, f32)>,
+    /// Flattened, three floats per vertex.
+    positions: Vec<f32>,
     weights: Vec<Vec<(u32, f32)>>,
     /// Same size as original buffer, containing where in `vertices` the one at this index got merged to.
     index_map: Vec<usize>,
@@ -372,7 +396,7 @@ fn merge_vertices(geo: &fdm::GeometrySection, units_per_cm: f32) -> VertexCache
     // For now we only merge bitwise-equivalent vertices.
     // This should be enough to undo automatic splitting.
 
-    let mut positions = Vec::<(f32, f32, f32)>::with_capacity(geo.position.len());
+    let mut positions = Vec::<f32>::with_capacity(geo.position.len() * 3);
     let mut weights = Vec::<Vec<(u32, f32)>>::with_capacity(geo.position.len());
     let mut index_map = Vec::<usize>::with_capacity(geo.position.len());
     let mut value_cache = HashMap::<Vec<u8>, usize>::with_capacity(geo.position.len());
@@ -405,9 +429,9 @@ fn merge_vertices(geo: &fdm::GeometrySection, units_per_cm: f32) -> VertexCache
         match entry {
             std::collections::hash_map::Entry::Occupied(o) => index_map.push(*o.get()),
             std::collections::hash_map::Entry::Vacant(v) => {
-                index_map.push(positions.len());
-                v.insert(positions.len());
-                positions.push(vtx.co);
+                index_map.push(weights.len());
+                v.insert(weights.len());
+                positions.extend_from_slice(&[vtx.co.0, vtx.co.1, vtx.co.2]);
                 weights.push(vtx.weights);
             }
         }
@@ -434,13 +458,23 @@ fn mat_to_row_tuples(src: vek::Mat4<f32>) ->(
     )
 }
 
-fn rgba_bytes_to_float(c: Rgba) -> (f32, f32, f32, f32) {
-    (
+fn rgba_bytes_to_float(c: Rgba) -> [f32; 4] {
+    [
         (c.r as f32)/255.0,
         (c.g as f32)/255.0,
         (c.b as f32)/255.0,
         (c.a as f32)/255.0
-    )
+    ]
+}
+
+/// Flatten keyframes into `time, value` pairs, the layout `keyframe_points.foreach_set("co", ...)` wants.
+fn keyframe_co<T>(keyframes: &[(f32, T)], framerate: f32, value: impl Fn(&T) -> f32) -> Vec<f32> {
+    let mut co = Vec::with_capacity(keyframes.len() * 2);
+    for (ts, v) in keyframes {
+        co.push(*ts * framerate);
+        co.push(value(v));
+    }
+    co
 }
 
 trait ToAnimation {
@@ -452,19 +486,19 @@ impl ToAnimation for fdm::LinearVector3ControllerSection {
         let xa = ir::Animation {
             target_path: String::from(path),
             target_index: 0,
-            fcurve: self.keyframes.iter().map(|(ts, v)| (*ts * framerate, v.x * scale) ).collect()
+            fcurve: keyframe_co(&self.keyframes, framerate, |v| v.x * scale)
         };
 
         let ya = ir::Animation {
             target_path: String::from(path),
             target_index: 1,
-            fcurve: self.keyframes.iter().map(|(ts, v)| (*ts * framerate, v.y * scale) ).collect()
+            fcurve: keyframe_co(&self.keyframes, framerate, |v| v.y * scale)
         };
 
         let za = ir::Animation {
             target_path: String::from(path),
             target_index: 2,
-            fcurve: self.keyframes.iter().map(|(ts, v)| (*ts * framerate, v.z * scale) ).collect()
+            fcurve: keyframe_co(&self.keyframes, framerate, |v| v.z * scale)
         };
 
         Ok(vec![
@@ -480,25 +514,25 @@ impl ToAnimation for fdm::QuatLinearRotationControllerSection {
         let xa = ir::Animation {
             target_path: String::from(path),
             target_index: 1,
-            fcurve: self.keyframes.iter().map(|(ts, v)| (*ts * framerate, v.x) ).collect()
+            fcurve: keyframe_co(&self.keyframes, framerate, |v| v.x)
         };
 
         let ya = ir::Animation {
             target_path: String::from(path),
             target_index: 2,
-            fcurve: self.keyframes.iter().map(|(ts, v)| (*ts * framerate, v.y) ).collect()
+            fcurve: keyframe_co(&self.keyframes, framerate, |v| v.y)
         };
 
         let za = ir::Animation {
             target_path: String::from(path),
             target_index: 3,
-            fcurve: self.keyframes.iter().map(|(ts, v)| (*ts * framerate, v.z) ).collect()
+            fcurve: keyframe_co(&self.keyframes, framerate, |v| v.z)
         };
 
         let wa = ir::Animation {
             target_path: String::from(path),
             target_index: 0,
-            fcurve: self.keyframes.iter().map(|(ts, v)| (*ts * framerate, v.w) ).collect()
+            fcurve: keyframe_co(&self.keyframes, framerate, |v| v.w)
         };
 
         Ok(vec![
@@ -15,29 +15,33 @@ fn pd2tools_fdm(_py: Python, m: &PyModule) -> PyResult<()> {
         pd2tools_rust::diesel_hash::from_str(s)
     }
 
+    #[pyfn(m, "diesel_hash_many")]
+    fn diesel_hash_many(strings: Vec<&str>) -> Vec<u64> {
+        strings.iter().map(|s| pd2tools_rust::diesel_hash::from_str(s)).collect()
+    }
+
     #[pyfn(m, "import_ir_from_file")]
     fn import_ir_from_file(py: Python, hashlist_path: &str, model_path: &str, units_per_cm: f32, framerate: f32) -> PyResult<Vec<Py<py_ir::Object>>> {
         let hlp = Some(String::from(hashlist_path));
-        let hashlist = pd2tools_rust::get_hashlist(&hlp);
+
+        // Loading the hashlist and parsing the model don't touch Python, so do
+        // both at once, and let Blender carry on while we do.
+        let (hashlist, sections) = py.allow_threads(|| rayon::join(
+            || pd2tools_rust::get_hashlist(&hlp),
+            || -> PyResult<_> {
+                let bytes = std::fs::read(model_path).map_err(PyErr::from)?;
+                fdm::parse_file(&bytes).map_err(|e| {
+                    let msg = format!("Failed parsing FDM: {}", e);
+                    pyo3::exceptions::PyException::new_err(msg)
+                })
+            }
+        ));
+
         let hashlist = match hashlist {
             Some(h) => h,
             None => return PyResult::Err(pyo3::exceptions::PyException::new_err("Failed to load hashlist"))
         };
-
-        let bytes = match std::fs::read(model_path) {
-            Err(e) => {
-                return PyResult::Err(PyErr::from(e))
-            },
-            Ok(b) => b
-        };
-
-        let sections = match fdm::parse_file(&bytes) {
-            Err(e) => {
-                let msg = format!("Failed parsing FDM: {}", e);
-                return PyResult::Err(pyo3::exceptions::PyException::new_err(msg))
-            },
-            Ok(s) => s
-        };
+        let sections = sections?;
 
         let r = ir_reader::sections_to_ir(py, &sections, &hashlist, units_per_cm, framerate);
         r.map_err(|e| {
@@ -1,38 +1,62 @@
 //! Glue representation.
 //!
 //! These structs are bundles of "convert chunk of data to/from python" routines,
-//! and a holder for the Rust representation of that chunk. It's all Vec and Tuple
-//! because this struct of arrays approach requires less fancy python code to copy
-//! into Blender, in particular, `vert_positions`, `edges`, and `faces` can just be
-//! passed straight to Mesh.from_pydata.
+//! and a holder for the Rust representation of that chunk. It's struct of arrays
+//! because that requires less fancy python code to copy into Blender.
+//!
+//! Each per-vertex, per-face, and per-loop attribute of a mesh is its own flat
+//! `Vec` of plain numbers (so positions are `x, y, z, x, y, z, ...`), in the same
+//! layout as the matching Blender property. They're handed over as `bytes`, so
+//! the addon can wrap them with `numpy.frombuffer` and give them to `foreach_set`
+//! without a Python object per element.
 //!
 //! Pyo3 will actually make the conversion routines for us, if we ask for getters
 //! and setters, but then insist on executing them on every single get, which is a
 //! rather substantial performance issue for meshes.
 
 use pyo3::prelude::*;
+use pyo3::types::PyBytes;
 use pyo3::{PyGCProtocol, PyTraverseError, PyVisit};
 
+/// Copy a slice of plain numbers into a `bytes`, in native byte order.
+fn to_pybytes<'py, T: Copy>(py: Python<'py>, src: &[T]) -> &'py PyBytes {
+    let bytes = unsafe {
+        std::slice::from_raw_parts(src.as_ptr() as *const u8, std::mem::size_of_val(src))
+    };
+    PyBytes::new(py, bytes)
+}
+
 #[pyclass]
 pub struct Armature { }
 #[pyclass]
 pub struct Animation {
     #[pyo3(get, set)] pub target_path: String,
     #[pyo3(get, set)] pub target_index: usize,
-    #[pyo3(get, set)] pub fcurve: Vec<(f32, f32)>
+    /// time, value for each keyframe
+    pub fcurve: Vec<f32>
+}
+#[pymethods]
+impl Animation {
+    #[getter]
+    pub fn get_fcurve<'py>(&self, py: Python<'py>) -> &'py PyBytes { to_pybytes(py, &self.fcurve) }
 }
 
 #[pyclass(gc)]
 pub struct Object {
     #[pyo3(get, set)] pub name: String,
     #[pyo3(get, set)] pub parent: Option<Py<Object>>,
+    /// Position of this object in the list returned by `import_ir_from_file`
+    #[pyo3(get, set)] pub index: usize,
+    /// `index` of the parent, so the addon can look it up in a list rather than hashing
+    #[pyo3(get, set)] pub parent_index: Option<usize>,
 
-    #[pyo3(get, set)] pub transform: (
+    /// Rows of the local transform, or None if it's the identity.
+    #[pyo3(get, set)] pub transform: Option<(
         (f32, f32, f32, f32),
         (f32, f32, f32, f32),
         (f32, f32, f32, f32),
         (f32, f32, f32, f32)
-    ),
+    )>,
 
     #[pyo3(get, set)] pub animations: Vec<Py<Animation>>,
     #[pyo3(get, set)] pub data: Option<PyObject>,
@@ -98,20 +122,26 @@ pub struct Camera { }
 pub struct Mesh {
     #[pyo3(get, set)] pub material_names: Vec<String>,
     #[pyo3(get, set)] pub has_normals: bool,
-
-    #[pyo3(get, set)] pub vert_positions: Vec<(f32, f32, f32)>,
+    /// Normals are the same on every loop of each vertex, so `vert_normals` is
+    /// filled in instead of `loop_normals`.
+    #[pyo3(get, set)] pub has_vertex_normals: bool,
+
+    /// x, y, z for each vertex
+    pub vert_positions: Vec<f32>,
+    /// x, y, z for each vertex
+    pub vert_normals: Vec<f32>,
     #[pyo3(get, set)] pub vert_weights: Vec<Vec<(u32, f32)>>,
 
-    #[pyo3(get, set)] pub edges: Vec<(usize, usize)>,
-    /// (sharp, seam)
-    #[pyo3(get, set)] pub edge_flags: Vec<(bool, bool)>,
-
-    #[pyo3(get, set)] pub faces: Vec<(usize, usize, usize)>,
-    #[pyo3(get, set)] pub face_materials: Vec<usize>,
+    /// Triples of vertex indices, which is also the loop vertex indices
+    pub faces: Vec<u32>,
+    pub face_materials: Vec<u32>,
 
-    #[pyo3(get, set)] pub loop_normals: Vec<(f32, f32, f32)>,
-    #[pyo3(get, set)] pub loop_uv_layers: Vec<(String, Vec<(f32, f32)>)>,
-    #[pyo3(get, set)] pub loop_colour_layers: Vec<(String, Vec<(f32, f32, f32, f32)>)>
+    /// x, y, z for each loop
+    pub loop_normals: Vec<f32>,
+    /// (name, u, v for each loop)
+    pub loop_uv_layers: Vec<(String, Vec<f32>)>,
+    /// (name, r, g, b, a for each loop)
+    pub loop_colour_layers: Vec<(String, Vec<f32>)>
 }
 #[pymethods]
 impl Mesh {
@@ -121,6 +151,41 @@ impl Mesh {
     #[getter]
     pub fn get_data_type(&self) -> &str { "MESH" }
 
+    /// Everything needed to build the mesh topology, in one call:
+    /// `(vert_positions, loop_vertices, face_loop_start, face_loop_total)`.
+    ///
+    /// `faces` is already the loop vertex indices, since every face is a triangle.
+    /// There are no edges, Blender works those out from the faces.
+    pub fn geometry<'py>(&self, py: Python<'py>) -> (&'py PyBytes, &'py PyBytes, &'py PyBytes, &'py PyBytes) {
+        let loop_start = (0..self.faces.len() as u32).step_by(3).collect::<Vec<u32>>();
+        let loop_total = vec![3u32; self.faces.len() / 3];
+        (
+            to_pybytes(py, &self.vert_positions),
+            to_pybytes(py, &self.faces),
+            to_pybytes(py, &loop_start),
+            to_pybytes(py, &loop_total)
+        )
+    }
+
+    #[getter]
+    pub fn get_face_materials<'py>(&self, py: Python<'py>) -> &'py PyBytes { to_pybytes(py, &self.face_materials) }
+
+    #[getter]
+    pub fn get_vert_normals<'py>(&self, py: Python<'py>) -> &'py PyBytes { to_pybytes(py, &self.vert_normals) }
+
+    #[getter]
+    pub fn get_loop_normals<'py>(&self, py: Python<'py>) -> &'py PyBytes { to_pybytes(py, &self.loop_normals) }
+
+    #[getter]
+    pub fn get_loop_uv_layers<'py>(&self, py: Python<'py>) -> Vec<(&str, &'py PyBytes)> {
+        self.loop_uv_layers.iter().map(|(n, l)| (n.as_str(), to_pybytes(py, l))).collect()
+    }
+
+    #[getter]
+    pub fn get_loop_colour_layers<'py>(&self, py: Python<'py>) -> Vec<(&str, &'py PyBytes)> {
+        self.loop_colour_layers.iter().map(|(n, l)| (n.as_str(), to_pybytes(py, l))).collect()
+    }
+
     #[getter]
     pub fn get_animations(&self) -> Vec<Py<Animation>> { Vec::new() }
 }
@@ -78,43 +78,19 @@ pub const fn hash_level(k : &[u8], level: u64) -> u64 {
 
     c = c.wrapping_add(k.len() as u64);
 
-    if len <= 23 {
-        while len > 0 {
-            c = c.wrapping_add(match len {
-                23 => (k[len_x + 22] as u64) << 56,
-                22 => (k[len_x + 21] as u64) << 48,
-                21 => (k[len_x + 20] as u64) << 40,
-                20 => (k[len_x + 19] as u64) << 32,
-                19 => (k[len_x + 18] as u64) << 24,
-                18 => (k[len_x + 17] as u64) << 16,
-                17 => (k[len_x + 16] as u64) << 8,
-                _ => 0
-            });
-            b = b.wrapping_add(match len {
-                16 => (k[len_x + 15] as u64) << 56,
-                15 => (k[len_x + 14] as u64) << 48,
-                14 => (k[len_x + 13] as u64) << 40,
-                13 => (k[len_x + 12] as u64) << 32,
-                12 => (k[len_x + 11] as u64) << 24,
-                11 => (k[len_x + 10] as u64) << 16,
-                10 => (k[len_x + 9] as u64) << 8,
-                9  => (k[len_x + 8] as u64),
-                _ => 0
-            });
-            a = a.wrapping_add(match len {
-                8 => (k[len_x + 7] as u64) << 56,
-                7 => (k[len_x + 6] as u64) << 48,
-                6 => (k[len_x + 5] as u64) << 40,
-                5 => (k[len_x + 4] as u64) << 32,
-                4 => (k[len_x + 3] as u64) << 24,
-                3 => (k[len_x + 2] as u64) << 16,
-                2 => (k[len_x + 1] as u64) << 8,
-                1 => (k[len_x + 0] as u64),
-                _ => 0
-            });
-            len -= 1;
-        }
+    // The remaining 0-23 bytes go little-endian into a, b, and c, except the
+    // low byte of c is reserved for the length. Pad them to a whole block so
+    // this is just three reads instead of a byte at a time.
+    let mut tail = [0u8; 24];
+    let mut i = 0;
+    while i < len as usize {
+        tail[i] = k[len_x + i];
+        i += 1;
     }
+    a = a.wrapping_add(read_le_u64(&tail, 0));
+    b = b.wrapping_add(read_le_u64(&tail, 8));
+    c = c.wrapping_add(read_le_u64(&tail, 16).wrapping_shl(8));
+
     let mixed = const_mix64(a, b, c);
     c = mixed.2;
     return c;
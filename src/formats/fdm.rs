@@ -8,6 +8,7 @@ use nom::combinator::{all_consuming, map};
 use nom::multi::{length_data, length_count, count};
 use nom::number::complete::{le_u32, le_u64};
 use nom::sequence::{tuple, terminated};
+use rayon::prelude::*;
 use vek::{Mat4, Vec2, Vec3, Vec4};
 use thiserror::Error;
 
@@ -64,13 +65,11 @@ impl<'a> UnparsedSection<'a> {
             Ok(d) => d,
             Err(_) => return ParseError::BadHeaders(hs).nom_err()
         };
-        eprintln!("UnparsedSection::parse 1: {} {}", input.offset(), input.len());
         let (input, data) = match length_data::<_, _, (), _>(le_u32)(input) {
             Ok(d) => d,
             Err(nom::Err::Incomplete(_)) => return ParseError::TruncatedSection { id }.nom_err(),
             Err(_) => return ParseError::BadHeaders(hs).nom_err(),
         };
-        eprintln!("UnparsedSection::parse 2: {} {}\n", input.offset(), input.len());
         Ok((input, UnparsedSection {
             r#type, id, data
         }))
@@ -112,7 +111,6 @@ pub fn split_to_sections<'a>(input: Subslice<'a, u8>) -> IResult<Subslice<'a, u8
     let mut parsed_sections = Vec::with_capacity(header.section_count as usize);
     let mut remaining_input = input_2;
     for i in 0..header.section_count {
-        eprintln!("split_to_sections: {} {} {}", i, remaining_input.offset(), remaining_input.len());
         if remaining_input.len() == 0 {
             return ParseError::NotEnoughSections { got: i, expected:header.section_count }.nom_err()
         }
@@ -258,12 +256,10 @@ pub fn parse_file<'a>(bytes: &'a [u8]) -> Result<HashMap<u32, Section>, ParseErr
         Err(nom::Err::Failure(e)) => return Err(e),
         Err(nom::Err::Error(e)) => return Err(e),
     };
-    let mut result = HashMap::<u32, Section>::new();
-    for ups in sections {
-        let parsed = parse_section(&ups)?;
-        result.insert(ups.id, parsed);
-    }
-    return Ok(result);
+    // Sections only refer to each other by ID, so they can be parsed independently.
+    sections.par_iter()
+        .map(|ups| parse_section(ups).map(|parsed| (ups.id, parsed)))
+        .collect::<Result<HashMap<u32, Section>, ParseError>>()
 }
 
 /// Metadata about the model file. Release Diesel never, AFAIK, actually cares about this.